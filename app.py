@@ -1,24 +1,75 @@
 from __future__ import annotations
 
-import io
-from typing import List, Optional
+import threading
+from typing import Optional
 
 from flask import Flask, jsonify, render_template, request
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+from pii_detector.cache import LRUCache, stream_digest
 from pii_detector.config import DEFAULT_MAX_FILE_SIZE_BYTES
-from pii_detector.detection import Entity, detect_pii, risk_score
-from pii_detector.extract import SUPPORTED_TYPES, extract_text
+from pii_detector.detection import detect_pii, filter_by_confidence, load_nlp_model, resolve_mode, risk_score
+from pii_detector.extract import SUPPORTED_TYPES, extract_text, file_extension
 from pii_detector.masking import apply_masks
 
 app = Flask(__name__)
-app.config["MAX_CONTENT_LENGTH"] = DEFAULT_MAX_FILE_SIZE_BYTES
+# Werkzeug rejects oversized bodies before they are read; the slack covers multipart headers
+app.config["MAX_CONTENT_LENGTH"] = DEFAULT_MAX_FILE_SIZE_BYTES + 4096
+
+# Extracted text of recent uploads, so re-posting a file skips PDF/DOCX/XLSX parsing.
+# Kept small since each entry can hold the text of a 10 MB document.
+_extract_cache: LRUCache[str] = LRUCache(maxsize=32)
+
+
+# spaCy is loaded in the background on the first hybrid request
+_nlp_ready = threading.Event()
+_nlp_warm_lock = threading.Lock()
+_nlp_warm_started = False
+
+
+def _warm_nlp() -> None:
+    load_nlp_model()
+    _nlp_ready.set()
+
+
+def _effective_mode(mode: str) -> str:
+    """Serve hybrid requests regex-only until the spaCy model has finished loading."""
+    global _nlp_warm_started
+    if mode != "hybrid" or _nlp_ready.is_set():
+        return mode
+    with _nlp_warm_lock:
+        if not _nlp_warm_started:
+            _nlp_warm_started = True
+            threading.Thread(target=_warm_nlp, daemon=True).start()
+    return "regex"
 
 
-def _filter_entities(entities: List[Entity], min_confidence: float) -> List[Entity]:
-    """Filter entities by minimum confidence threshold."""
-    if min_confidence <= 0.0:
-        return entities
-    return [e for e in entities if e.confidence >= min_confidence]
+def _wait_for_nlp(mode: str) -> str:
+    """Like _effective_mode, but block until spaCy is ready instead of downgrading."""
+    if _effective_mode(mode) != mode:
+        _nlp_ready.wait()
+    return mode
+
+
+def _json_response(payload: dict):
+    """Serialize with orjson when installed; it encodes Entity dataclasses natively."""
+    if orjson is None:
+        return jsonify(payload)
+    try:
+        body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_DATACLASS | orjson.OPT_NON_STR_KEYS)
+    except orjson.JSONEncodeError:
+        # orjson rejects strings that are not valid UTF-8 (e.g. lone surrogates from JSON input)
+        return jsonify(payload)
+    return app.response_class(body, mimetype="application/json")
+
+
+@app.errorhandler(413)
+def request_too_large(_exc):
+    return jsonify({"error": "file too large"}), 413
 
 
 @app.get("/health")
@@ -37,15 +88,17 @@ def api_detect():
     if payload.error:
         return jsonify({"error": payload.error}), 400
 
-    entities = detect_pii(payload.text, mode=payload.mode)
-    filtered_entities = _filter_entities(entities, payload.min_confidence)
+    # Uploaded documents are bulk input: long ones skip spaCy (lazy mode)
+    mode = resolve_mode(payload.text, _effective_mode(payload.mode), lazy=payload.uploaded)
+    entities = detect_pii(payload.text, mode=mode, lazy=payload.uploaded)
+    filtered_entities = filter_by_confidence(entities, payload.min_confidence)
     
-    return jsonify(
+    return _json_response(
         {
-            "entities": [e.to_dict() for e in filtered_entities],
+            "entities": filtered_entities,
             "risk": risk_score(filtered_entities),
             "mode": payload.mode,
-            "nlp": payload.mode != "regex",
+            "nlp": mode != "regex",
             "text": payload.text,
             "min_confidence": payload.min_confidence,
             "filtered_count": len(entities) - len(filtered_entities),
@@ -59,14 +112,15 @@ def api_mask():
     if payload.error:
         return jsonify({"error": payload.error}), 400
 
-    masking_mode = request.form.get("masking") or request.json.get("masking") if request.is_json else request.form.get("masking")
+    body = _json_body()
+    masking_mode = (body if body is not None else request.form).get("masking")
     if masking_mode not in {"partial", "full", "synthetic"}:
         masking_mode = "full"
 
     include_placeholders = False
-    if request.is_json:
-        include_placeholders = bool(request.json.get("includePlaceholders", False))
-        allowed_labels = request.json.get("maskTypes") or []
+    if body is not None:
+        include_placeholders = bool(body.get("includePlaceholders", False))
+        allowed_labels = body.get("maskTypes") or []
     else:
         include_placeholders = request.form.get("includePlaceholders") == "true"
         allowed_labels = request.form.getlist("maskTypes") if request.form else []
@@ -75,11 +129,18 @@ def api_mask():
         # accept comma-separated string fallback
         if isinstance(allowed_labels, str):
             allowed_labels = [lbl.strip() for lbl in allowed_labels.split(",") if lbl.strip()]
+        elif isinstance(allowed_labels, list):
+            # labels key a cache, so drop non-string (e.g. nested list) entries
+            allowed_labels = [lbl for lbl in allowed_labels if isinstance(lbl, str)]
+        else:
+            allowed_labels = []
     else:
         allowed_labels = []
 
-    entities = detect_pii(payload.text, mode=payload.mode)
-    filtered_entities = _filter_entities(entities, payload.min_confidence)
+    # Masking must not leak names through a regex-only scan: wait for spaCy and never run lazily
+    mode = _wait_for_nlp(payload.mode)
+    entities = detect_pii(payload.text, mode=mode, lazy=False)
+    filtered_entities = filter_by_confidence(entities, payload.min_confidence)
     
     masked = apply_masks(
         payload.text,
@@ -88,9 +149,11 @@ def api_mask():
         include_placeholders=include_placeholders,
         allowed_labels=allowed_labels or None,
     )
-    return jsonify(
+    return _json_response(
         {
             "masked": masked,
+            "mode": payload.mode,
+            "nlp": mode != "regex",
             "masking": masking_mode,
             "includePlaceholders": include_placeholders,
             "maskTypes": allowed_labels,
@@ -101,21 +164,38 @@ def api_mask():
 
 
 class Payload:
-    def __init__(self, text: str = "", mode: str = "hybrid", min_confidence: float = 0.0, error: Optional[str] = None):
+    def __init__(
+        self,
+        text: str = "",
+        mode: str = "hybrid",
+        min_confidence: float = 0.0,
+        error: Optional[str] = None,
+        uploaded: bool = False,
+    ):
         self.text = text
         self.mode = mode
         self.min_confidence = min_confidence
         self.error = error
+        self.uploaded = uploaded
+
+
+def _json_body() -> Optional[dict]:
+    """Return the decoded JSON object once per request, or None for form/invalid bodies."""
+    if not request.is_json:
+        return None
+    body = request.get_json(silent=True)
+    return body if isinstance(body, dict) else None
 
 
 def _parse_payload() -> Payload:
     mode = "hybrid"
     min_confidence = 0.0
     
-    if request.is_json and request.json:
-        mode = request.json.get("mode", "hybrid")
-        min_confidence = float(request.json.get("minConfidence", 0.0))
-        text = request.json.get("text") or ""
+    body = _json_body()
+    if body:
+        mode = body.get("mode", "hybrid")
+        min_confidence = float(body.get("minConfidence", 0.0))
+        text = body.get("text") or ""
         if not text:
             return Payload(error="text is required for JSON requests")
         if not 0.0 <= min_confidence <= 1.0:
@@ -126,14 +206,14 @@ def _parse_payload() -> Payload:
     text = request.form.get("text") or ""
     if uploaded:
         filename = uploaded.filename or ""
-        ext = filename.lower().rsplit(".", 1)[-1] if "." in filename else ""
+        ext = file_extension(filename)
         if ext not in SUPPORTED_TYPES:
             return Payload(error="unsupported file type")
-        data = uploaded.read()
-        if len(data) > DEFAULT_MAX_FILE_SIZE_BYTES:
-            return Payload(error="file too large")
+        # Hand the spooled upload straight to the extractor instead of copying it into memory
+        stream = uploaded.stream
         try:
-            text = extract_text(filename, data)
+            key = (stream_digest(stream), ext)
+            text = _extract_cache.get_or_compute(key, lambda: extract_text(filename, stream))
         except Exception as exc:  # pragma: no cover - extraction errors
             return Payload(error=f"failed to parse file: {exc}")
     if not text:
@@ -150,7 +230,7 @@ def _parse_payload() -> Payload:
     except (ValueError, TypeError):
         min_confidence = 0.0
     
-    return Payload(text=text, mode=mode, min_confidence=min_confidence)
+    return Payload(text=text, mode=mode, min_confidence=min_confidence, uploaded=bool(uploaded))
 
 
 if __name__ == "__main__":
@@ -3,10 +3,11 @@ import json
 import os
 import sys
 from pathlib import Path
-from typing import List, Tuple
-from pii_detector.config import DEFAULT_MAX_FILE_SIZE_BYTES
-from pii_detector.detection import Entity, detect_pii, risk_score
-from pii_detector.extract import SUPPORTED_TYPES, extract_text
+from typing import List
+from pii_detector.batch import process_files
+from pii_detector.config import DEFAULT_MAX_FILE_SIZE_BYTES, NLP_LAZY_MAX_CHARS
+from pii_detector.detection import detect_pii, filter_by_confidence, resolve_mode, risk_bucket, risk_score
+from pii_detector.extract import SUPPORTED_TYPES, extract_text, file_extension
 from pii_detector.masking import apply_masks
 
 
@@ -16,7 +17,7 @@ def _load_text(input_value: str) -> str:
             print(f"Error: '{input_value}' is not a file.", file=sys.stderr)
             sys.exit(1)
 
-        ext = input_value.lower().rsplit(".", 1)[-1] if "." in input_value else ""
+        ext = file_extension(input_value)
         if ext not in SUPPORTED_TYPES:
             print(
                 "Error: unsupported file type. Supported: "
@@ -40,39 +41,44 @@ def _load_text(input_value: str) -> str:
     return input_value
 
 
+def _lazy_note(text: str, mode: str, lazy: bool) -> str:
+    """Explain a lazy hybrid -> regex downgrade, or return "" when the requested mode runs."""
+    if resolve_mode(text, mode, lazy) == mode:
+        return ""
+    return f"regex-only (over {NLP_LAZY_MAX_CHARS:,} chars; use --no-lazy to run spaCy)"
+
 def _collect_files(input_path: str) -> List[str]:
     """Collect all supported files from a path (file or directory)."""
     path = Path(input_path)
     
     if path.is_file():
-        ext = path.suffix.lstrip('.').lower()
+        ext = file_extension(path.name)
         if ext in SUPPORTED_TYPES:
             return [str(path)]
         return []
     
     if path.is_dir():
+        # Single directory walk with one stat per candidate file
         files = []
-        for ext in SUPPORTED_TYPES:
-            files.extend(path.rglob(f"*.{ext}"))
-        return [str(f) for f in files if f.is_file() and f.stat().st_size <= DEFAULT_MAX_FILE_SIZE_BYTES]
+        stack = [str(path)]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except PermissionError:
+                # Skip unreadable subdirectories like os.walk does
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        if file_extension(entry.name) in SUPPORTED_TYPES and entry.stat().st_size <= DEFAULT_MAX_FILE_SIZE_BYTES:
+                            files.append(entry.path)
+        return sorted(files)
     
     return []
 
 
-def _filter_entities(entities: List[Entity], min_confidence: float) -> List[Entity]:
-    """Filter entities by minimum confidence threshold."""
-    return [e for e in entities if e.confidence >= min_confidence]
-
-
-def _process_single(file_path: str, mode: str, min_confidence: float) -> Tuple[str, List[Entity], dict]:
-    """Process a single file and return text, filtered entities, and risk."""
-    text = _load_text(file_path)
-    entities = detect_pii(text, mode=mode)
-    filtered = _filter_entities(entities, min_confidence)
-    risk = risk_score(filtered)
-    return text, filtered, risk
-
-
 def main():
     parser = argparse.ArgumentParser(description="PII Detector CLI")
     parser.add_argument("input", help="Input text, file path, or directory path")
@@ -82,6 +88,8 @@ def main():
     parser.add_argument("--mask-mode", choices=["full", "partial", "synthetic"], default="full", help="Masking mode (default: full)")
     parser.add_argument("--min-confidence", type=float, default=0.0, help="Minimum confidence threshold (0.0-1.0, default: 0.0)")
     parser.add_argument("--batch", action="store_true", help="Process directory recursively")
+    parser.add_argument("--no-lazy", dest="lazy", action="store_false", help="Run spaCy on hybrid inputs of any length")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for batch mode (default: CPU count)")
     
     args = parser.parse_args()
     
@@ -89,6 +97,10 @@ def main():
     if not 0.0 <= args.min_confidence <= 1.0:
         print("Error: --min-confidence must be between 0.0 and 1.0", file=sys.stderr)
         sys.exit(1)
+
+    if args.workers is not None and args.workers < 1:
+        print("Error: --workers must be at least 1", file=sys.stderr)
+        sys.exit(1)
     
     # Batch mode: process directory
     if args.batch or (os.path.exists(args.input) and os.path.isdir(args.input)):
@@ -98,36 +110,44 @@ def main():
             sys.exit(1)
         
         print(f"Processing {len(files)} file(s)...", file=sys.stderr)
+        files_order = {file_path: i for i, file_path in enumerate(files)}
         
         batch_results = []
         total_entities = 0
         combined_risk = {"score": 0, "bucket": "low", "counts": {}, "placeholders": 0}
         
-        for file_path in files:
-            try:
-                text, entities, risk = _process_single(file_path, args.mode, args.min_confidence)
-                masked_text = apply_masks(text, entities, mode=args.mask_mode)
-                
-                batch_results.append({
-                    "file": file_path,
-                    "entities": [e.to_dict() for e in entities],
-                    "risk": risk,
-                    "masked_text": masked_text
-                })
-                
-                total_entities += len(entities)
-                combined_risk["score"] = max(combined_risk["score"], risk["score"])
-                for label, count in risk["counts"].items():
-                    combined_risk["counts"][label] = combined_risk["counts"].get(label, 0) + count
-                combined_risk["placeholders"] += risk["placeholders"]
-                
-                print(f"  {file_path}: {len(entities)} entities, risk={risk['bucket']}", file=sys.stderr)
-            except Exception as e:
-                print(f"  {file_path}: ERROR - {e}", file=sys.stderr)
+        # Extraction and detection run across worker processes; results are put back
+        # in file order and masked here so synthetic values stay unique and stable.
+        results = sorted(process_files(files, workers=args.workers, mode=args.mode, lazy=args.lazy), key=lambda r: files_order[r.filename])
+        for result in results:
+            if result.error:
+                print(f"  {result.filename}: ERROR - {result.error}", file=sys.stderr)
+                continue
+            entities = filter_by_confidence(result.entities, args.min_confidence)
+            risk = risk_score(entities)
+            masked_text = apply_masks(result.text, entities, mode=args.mask_mode)
+            
+            batch_results.append({
+                "file": result.filename,
+                "entities": [e.to_dict() for e in entities],
+                "risk": risk,
+                "masked_text": masked_text
+            })
+            
+            total_entities += len(entities)
+            combined_risk["score"] = max(combined_risk["score"], risk["score"])
+            for label, count in risk["counts"].items():
+                combined_risk["counts"][label] = combined_risk["counts"].get(label, 0) + count
+            combined_risk["placeholders"] += risk["placeholders"]
+            
+            note = _lazy_note(result.text, args.mode, args.lazy)
+            print(
+                f"  {result.filename}: {len(entities)} entities, risk={risk['bucket']}" + (f", {note}" if note else ""),
+                file=sys.stderr,
+            )
         
         # Update combined risk bucket
-        score = combined_risk["score"]
-        combined_risk["bucket"] = "critical" if score >= 80 else "high" if score >= 50 else "medium" if score >= 20 else "low"
+        combined_risk["bucket"] = risk_bucket(combined_risk["score"])
         
         # Output batch report
         batch_report = {
@@ -158,8 +178,11 @@ def main():
 
     print(f"Processing input ({len(text)} chars)...", file=sys.stderr)
     
-    entities = detect_pii(text, mode=args.mode)
-    filtered_entities = _filter_entities(entities, args.min_confidence)
+    note = _lazy_note(text, args.mode, args.lazy)
+    if note:
+        print(f"Note: {note}", file=sys.stderr)
+    entities = detect_pii(text, mode=args.mode, lazy=args.lazy)
+    filtered_entities = filter_by_confidence(entities, args.min_confidence)
     
     if args.min_confidence > 0.0:
         print(f"Filtered {len(entities) - len(filtered_entities)} entities below confidence {args.min_confidence}", file=sys.stderr)
@@ -0,0 +1,85 @@
+"""Parallel extraction and detection over many files."""
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Sequence
+
+from .detection import Entity, detect_pii_batch, load_nlp_model
+from .extract import extract_text
+
+# Files per worker task; spaCy batches the documents within a group
+BATCH_GROUP_SIZE = 32
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    filename: str
+    entities: List[Entity]
+    error: Optional[str]
+    time_ms: float
+    text: str = ""
+
+
+def process_files(
+    paths: Sequence[str],
+    workers: Optional[int] = None,
+    callback: Optional[Callable[[BatchResult], None]] = None,
+    mode: str = "hybrid",
+    lazy: bool = True,
+) -> Iterator[BatchResult]:
+    """Extract and detect PII in each file across a process pool.
+
+    Results are yielded (and passed to ``callback``) as files finish, not in
+    input order. Failures are reported through ``BatchResult.error``. ``lazy``
+    is passed to detect_pii_batch.
+    """
+    if not paths:
+        return
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    group_size = max(1, min(BATCH_GROUP_SIZE, -(-len(paths) // workers)))
+    groups = [list(paths[i : i + group_size]) for i in range(0, len(paths), group_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init, initargs=(mode,)) as executor:
+        futures = {executor.submit(_process_group, group, mode, lazy): group for group in groups}
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as exc:
+                results = [BatchResult(path, [], str(exc), 0.0) for path in futures[future]]
+            for result in results:
+                if callback:
+                    callback(result)
+                yield result
+
+
+def _worker_init(mode: str) -> None:
+    """Load the spaCy model when a worker starts instead of inside its first task."""
+    if mode != "regex":
+        load_nlp_model()
+
+
+def _process_group(paths: List[str], mode: str, lazy: bool = True) -> List[BatchResult]:
+    results: List[BatchResult] = []
+    loaded: List[str] = []
+    texts: List[str] = []
+    elapsed: List[float] = []
+    for path in paths:
+        started = time.perf_counter()
+        try:
+            with open(path, "rb") as f:
+                texts.append(extract_text(os.path.basename(path), f.read()))
+        except Exception as exc:
+            results.append(BatchResult(path, [], str(exc), (time.perf_counter() - started) * 1000))
+            continue
+        loaded.append(path)
+        elapsed.append(time.perf_counter() - started)
+    # Detect across the whole group so spaCy can batch documents with nlp.pipe
+    detections = detect_pii_batch(texts, mode=mode, lazy=lazy)
+    for path, text, extract_s in zip(loaded, texts, elapsed):
+        started = time.perf_counter()
+        entities = next(detections)
+        time_ms = (extract_s + time.perf_counter() - started) * 1000
+        results.append(BatchResult(path, entities, None, round(time_ms, 3), text))
+    return results
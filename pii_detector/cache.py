@@ -0,0 +1,51 @@
+"""Small bounded caches keyed by a digest of the input content."""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import BinaryIO, Callable, Generic, Hashable, TypeVar
+
+V = TypeVar("V")
+
+
+def content_digest(data: bytes) -> bytes:
+    """Return a short key for ``data`` so cached entries never pin large inputs."""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def stream_digest(stream: BinaryIO, chunk_size: int = 1024 * 1024) -> bytes:
+    """Digest a seekable stream chunk by chunk and rewind it for the next reader."""
+    hasher = hashlib.blake2b(digest_size=16)
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        hasher.update(chunk)
+    stream.seek(0)
+    return hasher.digest()
+
+
+class LRUCache(Generic[V]):
+    """Thread-safe least-recently-used mapping holding at most ``maxsize`` entries."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, V]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], V]) -> V:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+        # Compute outside the lock; concurrent misses on one key just race to store
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
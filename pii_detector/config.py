@@ -2,34 +2,135 @@
 from __future__ import annotations
 
 import re
-from typing import Dict, Pattern
+import sys
+from typing import Dict, Pattern, Tuple
+
+try:
+    import hyperscan  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    hyperscan = None
+
+# Possessive quantifiers (``*+``, ``++``, ``?+``, ``{m,n}+``) below are only used where the
+# next token can never match what the quantifier consumed, so they change no match and
+# just stop the engine from backtracking. Hyperscan and Python < 3.11 do not
+# support them and get the plain greedy form.
+_POSSESSIVE_MARKER = re.compile(r"(?<!\\)([*+?}])\+")
+
+
+def _without_possessive(source: str) -> str:
+    return _POSSESSIVE_MARKER.sub(r"\1", source)
+
+
+def _compile(source: str, flags: int = 0) -> Pattern[str]:
+    if sys.version_info < (3, 11):
+        source = _without_possessive(source)
+    return re.compile(source, flags)
+
 
 # Sensitivity weights used for risk scoring
 SENSITIVITY_WEIGHTS: Dict[str, int] = {"high": 3, "medium": 2, "low": 1}
 
-# Regex patterns tuned for Indian context with general fallbacks
+# Regex patterns tuned for Indian context with general fallbacks. Identifier patterns
+# are ASCII-only, so re.ASCII keeps \d, \s and \b off the Unicode lookup path.
 PII_PATTERNS: Dict[str, Pattern[str]] = {
-    "aadhaar": re.compile(r"\b(?:[2-9][0-9]{3}\s?[0-9]{4}\s?[0-9]{4})\b"),
-    "pan": re.compile(r"\b[A-Z]{5}[0-9]{4}[A-Z]\b"),
-    "passport": re.compile(r"\b[A-Z][0-9]{7}\b"),
-    "credit_card": re.compile(r"\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13}|6(?:011|5[0-9]{2})[0-9]{12})\b"),
-    "debit_card": re.compile(r"\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|6[0-9]{15}|2[0-9]{14})\b"),
-    "email": re.compile(r"\b[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}\b", re.IGNORECASE),
-    "phone": re.compile(r"\b(?:\+?91[-\s]?)?(?:(?<!\d)([6-9][0-9]{2})[-\s]?(\d{3})[-\s]?(\d{4})(?!\d))\b"),
-    "ip": re.compile(r"\b(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b"),
-    "dob": re.compile(r"\b(?:0?[1-9]|[12][0-9]|3[01])[-/](?:0?[1-9]|1[0-2])[-/](?:19\d{2}|20\d{2})\b"),
+    "aadhaar": _compile(r"\b(?:[2-9][0-9]{3}\s?+[0-9]{4}\s?+[0-9]{4})\b", re.ASCII),
+    "pan": re.compile(r"\b[A-Z]{5}[0-9]{4}[A-Z]\b", re.ASCII),
+    "passport": re.compile(r"\b[A-Z][0-9]{7}\b", re.ASCII),
+    # Any 13-16 digit run; the brand rules below and a Luhn check decide credit vs debit
+    "credit_card": _compile(r"\b[0-9]{13,16}+\b", re.ASCII),
+    # Parts are capped at RFC 5321 lengths so a long run without "@" is not rescanned
+    # from every word boundary inside it (quadratic on inputs like "a.a.a.a...")
+    "email": _compile(r"\b[A-Z0-9_][A-Z0-9._%+-]{0,63}+@[A-Z0-9.-]{1,253}\.[A-Z]{2,63}+\b", re.IGNORECASE),
+    # No lookarounds so the Hyperscan prefilter can compile it: a country
+    # code must be followed by a separator, and \b already rules out adjacent digits
+    "phone": _compile(r"\b(?:\+?91[-\s])?[6-9][0-9]{2}[-\s]?+[0-9]{3}[-\s]?+[0-9]{4}\b", re.ASCII),
+    # Dotted-quad candidate only; octet ranges are checked with ipaddress after matching
+    "ip": _compile(r"\b[0-9]{1,3}+(?:\.[0-9]{1,3}+){3}\b", re.ASCII),
+    "dob": re.compile(r"\b(?:0?[1-9]|[12][0-9]|3[01])[-/](?:0?[1-9]|1[0-2])[-/](?:19\d{2}|20\d{2})\b", re.ASCII),
     # Bank account: 9-18 digits with context keywords to avoid FP with phone/card
-    "bank_account": re.compile(
-        r"(?i)\b(?:acct|ac|account|a/c|a\\/?c\\/?|ac no\.?|account no\.?|a/c no\.?|act no\.?)[:#\s-]*([0-9]{9,18})\b"
+    "bank_account": _compile(
+        r"(?i)\b(?:acct|ac|account|a/c|a\\/?c\\/?|ac no\.?|account no\.?|a/c no\.?|act no\.?)[:#\s-]*+([0-9]{9,18}+)\b",
+        re.ASCII,
     ),
     # IFSC validation: 4 letters, 0, 6 alnum
-    "ifsc": re.compile(r"\b([A-Z]{4}0[0-9A-Z]{6})\b", re.IGNORECASE),
+    "ifsc": re.compile(r"\b([A-Z]{4}0[0-9A-Z]{6})\b", re.IGNORECASE | re.ASCII),
     # Generic Indian address cue (loose)
     "address": re.compile(r"\b(?:street|st\.|road|rd\.|nagar|colony|layout|phase|block|sector)\b", re.IGNORECASE),
-    "person_name": re.compile(r"\b([A-Z][a-z]{2,}\s+[A-Z][a-z]{1,})\b"),
+    # Bounded repeats keep backtracking per candidate word constant
+    "person_name": _compile(r"\b[A-Z][a-z]{2,20}+\s[A-Z][a-z]{1,20}+\b"),
+}
+
+# Label/pattern pairs in priority order, for loops over every pattern
+PATTERN_ITEMS: Tuple[Tuple[str, Pattern[str]], ...] = tuple(PII_PATTERNS.items())
+
+# Card brand rules applied to credit_card candidates, checked in order
+CARD_BRAND_PATTERNS: Dict[str, Pattern[str]] = {
+    "credit_card": re.compile(r"4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13}|6(?:011|5[0-9]{2})[0-9]{12}"),
+    "debit_card": re.compile(r"4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|6[0-9]{15}|2[0-9]{14}"),
 }
 
-PLACEHOLDER_VALUES = {
+# Flags that can be expressed as a scoped inline group, e.g. ``(?i:...)``
+_SCOPED_FLAGS = ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"), (re.VERBOSE, "x"))
+# Hyperscan has no (?a:...) group; it only scans ASCII text, where the flag changes nothing
+_STDLIB_SCOPED_FLAGS = _SCOPED_FLAGS + ((re.ASCII, "a"),)
+_GLOBAL_FLAGS_PREFIX = re.compile(r"^\(\?[aiLmsux]+\)")
+
+
+def _scoped_source(pattern: Pattern[str], scoped_flags=_STDLIB_SCOPED_FLAGS) -> str:
+    source = _GLOBAL_FLAGS_PREFIX.sub("", pattern.pattern)
+    flags = "".join(letter for flag, letter in scoped_flags if pattern.flags & flag)
+    return f"(?{flags}:{source})" if flags else source
+
+
+def _build_combined(items: Tuple[Tuple[str, Pattern[str]], ...]):
+    """Join all patterns into one named alternation so text is scanned once.
+
+    Always the stdlib engine: RE2's \s and \b are ASCII-only, so the Unicode
+    patterns (email, address, person_name) would match differently than their
+    per-pattern counterparts used by detection.
+    """
+    source = "|".join(f"(?P<{label}>{_scoped_source(p)})" for label, p in items)
+    return re.compile(source)
+
+
+# Single-pass scanner over PII_PATTERNS; match.lastgroup names the label.
+PII_COMBINED = _build_combined(PATTERN_ITEMS)
+
+
+_LONG_REPEAT = re.compile(r"\{(\d+),(?:[3-9]\d|\d{3,})\}")
+
+
+def _build_hyperscan(items: Tuple[Tuple[str, Pattern[str]], ...]):
+    """Compile the patterns into a Hyperscan block database, or None if unavailable.
+
+    Hyperscan reports where each pattern can match; detection re-runs PII_COMBINED
+    at those offsets only, so results are identical to a full finditer scan. That
+    re-check means a looser pattern is fine here, so long bounded repeats (too large
+    for Hyperscan with start-of-match tracking) are made open-ended.
+    """
+    if hyperscan is None:
+        return None
+    expressions = [
+        _LONG_REPEAT.sub(r"{\1,}", _without_possessive(_scoped_source(p, _SCOPED_FLAGS))).encode()
+        for _, p in items
+    ]
+    try:
+        database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        database.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(expressions),
+        )
+    except Exception:  # pragma: no cover - unsupported syntax or platform
+        return None
+    return database
+
+
+# Optional multi-pattern prefilter for PII_COMBINED (ASCII text only)
+PII_HYPERSCAN = _build_hyperscan(PATTERN_ITEMS)
+
+PLACEHOLDER_VALUES = frozenset({
     "0000000000",
     "1111111111",
     "1234567890",
@@ -43,16 +144,35 @@ PLACEHOLDER_VALUES = {
     "test@example.com",
     "john doe",
     "a n other",
-}
+})
 
-PLACEHOLDER_REGEXES = [
+PLACEHOLDER_REGEXES = (
     re.compile(r"\bX{4,}\b", re.IGNORECASE),
     re.compile(r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b"),
     re.compile(r"\b(?:1111|2222|3333|4444|5555|6666|7777|8888|9999){2,}\b"),
     re.compile(r"\b(?:aaa|bbb|ccc|ddd|eee|fff|ggg|hhh|iii|jjj|kkk|lll|mmm|nnn|ooo|ppp|qqq|rrr|sss|ttt|uuu|vvv|www|xxx|yyy|zzz){2,}\b", re.IGNORECASE),
     re.compile(r"\bplaceholder\b", re.IGNORECASE),
-]
+)
+
+# Known dummy values as one case-insensitive alternation, longest first
+PLACEHOLDER_VALUES_PATTERN = re.compile(
+    "|".join(re.escape(v) for v in sorted({v.lower() for v in PLACEHOLDER_VALUES}, key=lambda v: (-len(v), v))),
+    re.IGNORECASE,
+)
+
+# All placeholder regexes as one alternation, scanned in a single pass
+PLACEHOLDER_COMBINED = re.compile("|".join(f"(?:{_scoped_source(p)})" for p in PLACEHOLDER_REGEXES))
 
 SPACY_MODEL_PREFERENCE = ["en_core_web_md", "en_core_web_sm"]
 
+# Hybrid scans of longer texts skip spaCy unless the caller opts out of lazy mode
+NLP_LAZY_MAX_CHARS = 50_000
+
+# spaCy input is split into chunks of at most this many characters (on paragraph
+# breaks where possible) to bound per-doc memory
+NLP_CHUNK_CHARS = 100_000
+
+# Only doc.ents is used; NER in the en_core_web pipelines has its own tok2vec
+SPACY_EXCLUDE = ["tok2vec", "tagger", "parser", "senter", "attribute_ruler", "lemmatizer"]
+
 DEFAULT_MAX_FILE_SIZE_BYTES = 10 * 1024 * 1024
@@ -1,26 +1,52 @@
 """Detection and risk scoring utilities for PII."""
 from __future__ import annotations
 
+import bisect
+import functools
+import ipaddress
+import itertools
 import re
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+import sys
+import threading
+from collections import Counter
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Iterable, Iterator, List, Match, Optional, Pattern, Sequence, Tuple
 
+from .cache import LRUCache, content_digest
 from .config import (
-    DEFAULT_MAX_FILE_SIZE_BYTES,
+    CARD_BRAND_PATTERNS,
+    NLP_CHUNK_CHARS,
+    NLP_LAZY_MAX_CHARS,
+    PATTERN_ITEMS,
+    PII_COMBINED,
+    PII_HYPERSCAN,
     PII_PATTERNS,
-    PLACEHOLDER_REGEXES,
+    PLACEHOLDER_COMBINED,
     PLACEHOLDER_VALUES,
+    PLACEHOLDER_VALUES_PATTERN,
     SENSITIVITY_WEIGHTS,
+    SPACY_EXCLUDE,
     SPACY_MODEL_PREFERENCE,
 )
+from .luhn import luhn_valid
 
 try:
     import spacy  # type: ignore
 except ImportError:  # pragma: no cover - optional dependency
     spacy = None
 
+try:
+    import hyperscan  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    hyperscan = None
+
+
+# Slotted dataclasses drop the per-instance __dict__; frozen+slots only pickles
+# reliably (for batch workers) from Python 3.11
+_SLOTS = {"slots": True} if sys.version_info >= (3, 11) else {}
 
-@dataclass
+
+@dataclass(frozen=True, **_SLOTS)
 class Entity:
     label: str
     start: int
@@ -42,49 +68,95 @@ class Entity:
         }
 
 
+_NLP_LOCK = threading.Lock()
+
+
+def load_nlp_model():
+    """Load the preferred spaCy model on first use; None when unavailable."""
+    # Serialize first use so concurrent requests don't each load the model
+    with _NLP_LOCK:
+        return _load_nlp_model()
+
+
+@functools.lru_cache(maxsize=1)
 def _load_nlp_model():
     if not spacy:
         return None
     for model in SPACY_MODEL_PREFERENCE:
         try:
-            return spacy.load(model)
+            return spacy.load(model, exclude=SPACY_EXCLUDE)
         except Exception:
             continue
     return None
 
 
-NLP = _load_nlp_model()
+# Results keyed by (text digest, mode) so repeated scans (e.g. detect then mask)
+# are free; keying by digest keeps large texts from being pinned in memory
+_DETECT_CACHE: LRUCache[Tuple[Entity, ...]] = LRUCache(maxsize=1024)
+
+_PLACEHOLDER_VALUES_LOWER = frozenset(value.lower() for value in PLACEHOLDER_VALUES)
+
+# The alternation stops at the first label that matches at an offset; only that
+# label and the ones listed after it can match starting there.
+_PATTERNS_FROM: Dict[str, Tuple[Tuple[str, Pattern[str]], ...]] = {
+    label: PATTERN_ITEMS[idx:] for idx, (label, _) in enumerate(PATTERN_ITEMS)
+}
+
+# Every pattern starts with \b, so matches can only begin at a word boundary
+# (ASCII or Unicode, as the patterns mix both)
+_MATCH_STARTS = re.compile(r"\b|(?a:\b)")
+
+
+def _is_valid_ip(value: str) -> bool:
+    try:
+        ipaddress.ip_address(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _card_label(digits: str) -> Optional[str]:
+    """Classify a 13-16 digit candidate as credit_card/debit_card, or None if not a card."""
+    if not luhn_valid(digits):
+        return None
+    for label, pattern in CARD_BRAND_PATTERNS.items():
+        if pattern.fullmatch(digits):
+            return label
+    return None
+
+
+# Post-match checks for labels whose regex only finds candidates
+_VALIDATORS: Dict[str, Callable[[str], bool]] = {
+    "ip": _is_valid_ip,
+}
+
+
+_SENSITIVITY: Dict[str, str] = {
+    "aadhaar": "high",
+    "passport": "high",
+    "credit_card": "high",
+    "pan": "high",
+    "bank_account": "high",
+    "email": "medium",
+    "phone": "medium",
+    "ip": "medium",
+    "dob": "medium",
+}
 
 
 def _score_sensitivity(label: str) -> str:
-    high = {"aadhaar", "passport", "credit_card", "pan", "bank_account"}
-    medium = {"email", "phone", "ip", "dob"}
-    if label in high:
-        return "high"
-    if label in medium:
-        return "medium"
-    return "low"
+    return _SENSITIVITY.get(label, "low")
+
+
+def is_placeholder(value: str) -> bool:
+    """Return True if ``value`` is a known dummy value or looks like one."""
+    return value.lower() in _PLACEHOLDER_VALUES_LOWER or bool(PLACEHOLDER_COMBINED.search(value))
 
 
 def detect_placeholders(text: str) -> List[Entity]:
     hits: List[Entity] = []
-    lower_text = text.lower()
-    for value in PLACEHOLDER_VALUES:
-        idx = lower_text.find(value.lower())
-        if idx != -1:
-            hits.append(
-                Entity(
-                    label="placeholder",
-                    start=idx,
-                    end=idx + len(value),
-                    value=text[idx : idx + len(value)],
-                    confidence=0.4,
-                    sensitivity="low",
-                    placeholder=True,
-                )
-            )
-    for regex in PLACEHOLDER_REGEXES:
-        for m in regex.finditer(text):
+    for pattern in (PLACEHOLDER_VALUES_PATTERN, PLACEHOLDER_COMBINED):
+        for m in pattern.finditer(text):
             hits.append(
                 Entity(
                     label="placeholder",
@@ -99,34 +171,211 @@ def detect_placeholders(text: str) -> List[Entity]:
     return hits
 
 
+# Hyperscan works on bytes with ASCII \s; outside this range its offsets or
+# whitespace class could disagree with the re-based scanner
+_HYPERSCAN_UNSAFE = re.compile(r"[^\x00-\x1b\x20-\x7f]")
+_hyperscan_local = threading.local()
+
+
+def _hyperscan_scratch():
+    # Hyperscan scratch space cannot be shared between concurrent scans
+    scratch = getattr(_hyperscan_local, "scratch", None)
+    if scratch is None:
+        scratch = _hyperscan_local.scratch = hyperscan.Scratch(PII_HYPERSCAN)
+    return scratch
+
+
+def _combined_searcher(text: str) -> Callable[[int], Optional[Match[str]]]:
+    """Return ``search(pos)`` equivalent to ``PII_COMBINED.search(text, pos)``.
+
+    With Hyperscan available, only the spans it reports as candidates are
+    checked with PII_COMBINED.match; otherwise the stdlib scanner is used.
+    """
+    if PII_HYPERSCAN is None or _HYPERSCAN_UNSAFE.search(text):
+        return functools.partial(PII_COMBINED.search, text)
+
+    events: List[Tuple[int, int]] = []
+    PII_HYPERSCAN.scan(
+        text.encode("ascii"),
+        match_event_handler=lambda _id, start, end, _flags, _context: events.append((start, end)),
+        scratch=_hyperscan_scratch(),
+    )
+    # Every real match lies inside a reported span, so scanning their union is exact
+    starts: List[int] = []
+    ends: List[int] = []
+    for start, end in sorted(events):
+        if ends and start < ends[-1]:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+
+    def search(pos: int) -> Optional[Match[str]]:
+        for idx in range(bisect.bisect_right(ends, pos), len(ends)):
+            for candidate in range(max(starts[idx], pos), ends[idx]):
+                match = PII_COMBINED.match(text, candidate)
+                if match:
+                    return match
+        return None
+
+    return search
+
+
 def detect_regex(text: str) -> List[Entity]:
+    """Scan text once with PII_COMBINED.
+
+    Results match running every pattern's finditer separately and deduplicating,
+    which is how detection was first defined: each pattern resumes after its own
+    last match, so a match starting inside an already-kept entity is consumed
+    (and dropped as an overlap) rather than leaving its suffix to match later.
+    """
+    search = _combined_searcher(text)
+    # Where each pattern's own finditer would resume
+    resume = dict.fromkeys(PII_PATTERNS, 0)
+    placeholders = sorted(detect_placeholders(text), key=lambda e: (e.start, -(e.end - e.start)))
+    ph_idx = 0
     entities: List[Entity] = []
-    for label, pattern in PII_PATTERNS.items():
-        for match in pattern.finditer(text):
-            value = match.group(0)
-            # Bank account pattern captures digits in group 1
-            if label == "bank_account" and match.lastindex:
-                value = match.group(match.lastindex)
-            sensitivity = _score_sensitivity(label)
-            confidence = 0.7 if label != "person_name" else 0.4
-            entities.append(
-                Entity(
-                    label=label,
-                    start=match.start(),
-                    end=match.end(),
-                    value=value,
-                    confidence=confidence,
-                    sensitivity=sensitivity,
-                )
-            )
-    entities.extend(detect_placeholders(text))
-    return _deduplicate_entities(entities)
+    pos = 0
+    match = search(pos)
+    while match is not None or ph_idx < len(placeholders):
+        while ph_idx < len(placeholders) and placeholders[ph_idx].start < pos:
+            ph_idx += 1
+        placeholder = placeholders[ph_idx] if ph_idx < len(placeholders) else None
+        # A pending match at or after pos is still the next one; re-search only past it
+        if match is not None and match.start() < pos:
+            match = search(pos)
+        if match is None and placeholder is None:
+            break
+        if match is None or (placeholder is not None and placeholder.start < match.start()):
+            kept = placeholder
+            start = placeholder.start
+        else:
+            start = match.start()
+            kept = _regex_entity_at(text, start, match.lastgroup, resume)
+            # Placeholders are listed after regex hits, so they only win when longer
+            if placeholder is not None and placeholder.start == start and (
+                kept is None or placeholder.end > kept.end
+            ):
+                kept = placeholder
+            if kept is None:
+                pos = start + 1
+                continue
+        entities.append(kept)
+        # Patterns matching at start itself were already advanced unless a placeholder won there
+        _consume_overlaps(text, start if kept.placeholder else start + 1, kept.end, resume)
+        pos = kept.end
+    return entities
+
+
+def _regex_entity_at(text: str, start: int, first_label: str, resume: Dict[str, int]) -> Optional[Entity]:
+    """Longest valid entity among the patterns matching at ``start``; advances ``resume``."""
+    best: Optional[Entity] = None
+    for label, pattern in _PATTERNS_FROM[first_label]:
+        if resume[label] > start:
+            continue
+        match = pattern.match(text, start)
+        if match is None:
+            continue
+        end = match.end()
+        resume[label] = end
+        if best is not None and end <= best.end:
+            continue
+        # Bank account pattern captures digits in its first group
+        value = match.group(1) if label == "bank_account" else match.group(0)
+        validator = _VALIDATORS.get(label)
+        if validator and not validator(value):
+            continue
+        if label == "credit_card":
+            label = _card_label(value)
+            if label is None:
+                continue
+        best = Entity(
+            label=label,
+            start=start,
+            end=end,
+            value=value,
+            confidence=0.7 if label != "person_name" else 0.4,
+            sensitivity=_score_sensitivity(label),
+        )
+    return best
+
+
+def _consume_overlaps(text: str, start: int, end: int, resume: Dict[str, int]) -> None:
+    """Advance each pattern past its matches starting inside a kept entity."""
+    for boundary in _MATCH_STARTS.finditer(text, start, end):
+        pos = boundary.start()
+        if pos >= end:
+            break
+        first = PII_COMBINED.match(text, pos)
+        if first is None:
+            continue
+        if resume[first.lastgroup] <= pos:
+            resume[first.lastgroup] = first.end()
+        for label, pattern in _PATTERNS_FROM[first.lastgroup][1:]:
+            if resume[label] <= pos:
+                match = pattern.match(text, pos)
+                if match:
+                    resume[label] = match.end()
+
+
+def detect_regex_stream(blocks: Iterable[str]) -> List[Entity]:
+    """Regex-scan text blocks one at a time, as produced by extract_text_stream.
+
+    Offsets are relative to the blocks joined with "\n"; a match spanning two
+    blocks (e.g. across a page break) is not reported.
+    """
+    entities: List[Entity] = []
+    base_offset = 0
+    for block in blocks:
+        for ent in detect_regex(block):
+            entities.append(replace(ent, start=ent.start + base_offset, end=ent.end + base_offset))
+        base_offset += len(block) + 1
+    return entities
 
 
 def detect_nlp(text: str) -> List[Entity]:
-    if not NLP:
+    nlp = load_nlp_model()
+    if not nlp:
         return []
-    doc = NLP(text)
+    return next(_nlp_entities(nlp, [text]))
+
+
+def _split_for_nlp(text: str, max_chars: int) -> List[Tuple[int, str]]:
+    """Split text into (offset, chunk) pieces of at most max_chars, preferring paragraph breaks."""
+    pieces: List[Tuple[int, str]] = []
+    start = 0
+    while len(text) - start > max_chars:
+        limit = start + max_chars
+        cut = -1
+        for sep in ("\n\n", "\n", " "):
+            idx = text.rfind(sep, start, limit)
+            if idx > start:
+                cut = idx + len(sep)
+                break
+        if cut == -1:
+            cut = limit
+        pieces.append((start, text[start:cut]))
+        start = cut
+    pieces.append((start, text[start:]))
+    return pieces
+
+
+def _nlp_entities(nlp, texts: Sequence[str]) -> Iterator[List[Entity]]:
+    """Yield each text's spaCy entities, running bounded chunks through nlp.pipe."""
+    pieces = [
+        (idx, offset, chunk)
+        for idx, text in enumerate(texts)
+        for offset, chunk in _split_for_nlp(text, NLP_CHUNK_CHARS)
+    ]
+    docs = nlp.pipe((chunk for _, _, chunk in pieces), batch_size=16)
+    for _, group in itertools.groupby(zip(pieces, docs), key=lambda item: item[0][0]):
+        entities: List[Entity] = []
+        for (_, offset, _), doc in group:
+            entities.extend(_doc_entities(doc, offset))
+        yield _deduplicate_entities(entities)
+
+
+def _doc_entities(doc, offset: int = 0) -> List[Entity]:
     entities: List[Entity] = []
     for ent in doc.ents:
         label = None
@@ -140,17 +389,45 @@ def detect_nlp(text: str) -> List[Entity]:
             entities.append(
                 Entity(
                     label=label,
-                    start=ent.start_char,
-                    end=ent.end_char,
+                    start=ent.start_char + offset,
+                    end=ent.end_char + offset,
                     value=ent.text,
-                    confidence=float(ent.score) if hasattr(ent, "score") else 0.55,
+                    # Rounded here so API responses can serialize Entity as-is
+                    confidence=round(float(ent.score), 3) if hasattr(ent, "score") else 0.55,
                     sensitivity=_score_sensitivity(label),
                 )
             )
-    return _deduplicate_entities(entities)
+    return entities
+
+
+def resolve_mode(text: str, mode: str, lazy: bool = True) -> str:
+    """Return the mode detect_pii actually runs: lazy hybrid scans of long texts are regex-only."""
+    if lazy and mode == "hybrid" and len(text) > NLP_LAZY_MAX_CHARS:
+        return "regex"
+    return mode
+
+
+def detect_pii(text: str, mode: str = "hybrid", *, lazy: bool = True) -> List[Entity]:
+    """Detect PII in ``text``, reusing the result for text seen recently with the same mode.
 
+    With ``lazy`` (the default, meant for bulk ingestion) texts longer than
+    NLP_LAZY_MAX_CHARS skip spaCy; use analyze_query when NLP must always run.
+    """
+    mode = resolve_mode(text, mode, lazy)
+    key = (content_digest(text.encode("utf-8", "surrogatepass")), mode)
+    return list(_DETECT_CACHE.get_or_compute(key, lambda: tuple(_detect_pii(text, mode))))
 
-def detect_pii(text: str, mode: str = "hybrid") -> List[Entity]:
+
+def analyze_query(text: str) -> List[Entity]:
+    """Hybrid detection that always runs spaCy, for interactive inputs."""
+    return detect_pii(text, mode="hybrid", lazy=False)
+
+
+def clear_pii_cache() -> None:
+    _DETECT_CACHE.clear()
+
+
+def _detect_pii(text: str, mode: str) -> List[Entity]:
     regex_hits = detect_regex(text)
     if mode == "regex":
         return regex_hits
@@ -159,95 +436,110 @@ def detect_pii(text: str, mode: str = "hybrid") -> List[Entity]:
     return combined
 
 
+def detect_pii_batch(texts: Sequence[str], mode: str = "hybrid", *, lazy: bool = True) -> Iterator[List[Entity]]:
+    """Like detect_pii over many texts, feeding spaCy through nlp.pipe in batches."""
+    modes = [resolve_mode(text, mode, lazy) for text in texts]
+    nlp = load_nlp_model() if any(m != "regex" for m in modes) else None
+    nlp_hits = _nlp_entities(nlp, [t for t, m in zip(texts, modes) if m != "regex"]) if nlp else None
+    for text, text_mode in zip(texts, modes):
+        if nlp_hits is None or text_mode == "regex":
+            yield detect_regex(text)
+        else:
+            yield _deduplicate_entities(detect_regex(text) + next(nlp_hits))
+
+
+def filter_by_confidence(entities: List[Entity], min_confidence: float) -> List[Entity]:
+    """Drop entities below ``min_confidence``; returns the input list unchanged at 0."""
+    if min_confidence <= 0.0:
+        return entities
+    return [e for e in entities if e.confidence >= min_confidence]
+
+
+# Lower bounds of the medium, high and critical buckets
+_RISK_THRESHOLDS = (20, 50, 80)
+_RISK_BUCKETS = ("low", "medium", "high", "critical")
+
+
+def risk_bucket(score: float) -> str:
+    return _RISK_BUCKETS[bisect.bisect_right(_RISK_THRESHOLDS, score)]
+
+
+_WEIGHTS: Dict[str, int] = {
+    "aadhaar": 35, "pan": 25, "passport": 30, "credit_card": 35, "bank_account": 30,
+    "email": 5, "phone": 10, "ip": 1, "dob": 5, "person_name": 2, "address": 5, "ifsc": 5
+}
+# Any of these sets a high-risk floor on the score
+_CRITICAL_TYPES = frozenset({"aadhaar", "credit_card", "passport", "bank_account"})
+_CONTACT_TYPES = frozenset({"address", "phone", "email"})
+_FINANCIAL_TYPES = frozenset({"credit_card", "bank_account"})
+_GDPR_TYPES = frozenset({"person_name", "address", "email", "ip", "dob"})
+_DPDP_TYPES = frozenset({"aadhaar", "phone", "email", "pan", "bank_account"})
+_HIPAA_TYPES = frozenset({"person_name", "address", "dob"})
+_PCI_TYPES = frozenset({"credit_card"})
+
+
 def risk_score(entities: List[Entity]) -> Dict[str, object]:
     # Real-world risk scoring model
-    # 1. Base Weights (Impact of a single occurrence)
-    weights = {
-        "aadhaar": 35, "pan": 25, "passport": 30, "credit_card": 35, "bank_account": 30,
-        "email": 5, "phone": 10, "ip": 1, "dob": 5, "person_name": 2, "address": 5, "ifsc": 5
-    }
-    
-    score = 0.0
-    type_counts: Dict[str, int] = {}
-    placeholder_count = 0
-    unique_types = set()
+    # 1. Base Weights (Impact of a single occurrence): see _WEIGHTS
+    type_counts = Counter(ent.label for ent in entities if not ent.placeholder)
+    placeholder_count = len(entities) - sum(type_counts.values())
+    unique_types = type_counts.keys()
 
-    for ent in entities:
-        if ent.placeholder:
-            placeholder_count += 1
-            continue 
-        
-        type_counts[ent.label] = type_counts.get(ent.label, 0) + 1
-        unique_types.add(ent.label)
-        
-        # Diminishing returns for volume to simulate real-world exposure
-        # 1st item: 100% impact
-        # 2nd item: 50% impact (confirmation)
-        # 3rd+ item: 10% impact (bulk data)
-        count = type_counts[ent.label]
-        w = weights.get(ent.label, 1)
-        
-        if count == 1:
-            score += w
-        elif count == 2:
-            score += w * 0.5
-        else:
-            score += w * 0.1
+    # Diminishing returns for volume to simulate real-world exposure
+    # 1st item: 100% impact
+    # 2nd item: 50% impact (confirmation)
+    # 3rd+ item: 10% impact (bulk data)
+    score = 0.0
+    for label, count in type_counts.items():
+        score += _WEIGHTS.get(label, 1) * (1 + 0.5 * (count >= 2) + 0.1 * max(0, count - 2))
 
     # 2. Critical Boosters (Presence of ANY high-risk item sets a floor)
     # Finding a single Credit Card or Aadhaar is immediately a high-risk event.
-    critical_types = {"aadhaar", "credit_card", "passport", "bank_account"}
-    if any(t in unique_types for t in critical_types):
+    if _CRITICAL_TYPES & unique_types:
         score = max(score, 65) 
 
     # 3. Combination Boosters (The "Trinity" effect)
     # Identity Theft Risk: Name + DOB + (Address OR Phone OR Email)
     has_identity = "person_name" in unique_types and "dob" in unique_types
-    has_contact = any(t in unique_types for t in ["address", "phone", "email"])
+    has_contact = bool(_CONTACT_TYPES & unique_types)
     if has_identity and has_contact:
         score += 25
     
     # Financial Fraud Risk: (Card OR Bank) + Name
-    has_financial = any(t in unique_types for t in ["credit_card", "bank_account"])
+    has_financial = bool(_FINANCIAL_TYPES & unique_types)
     if has_financial and "person_name" in unique_types:
         score += 20
 
     # 4. Normalization and Bucketing
     normalized = min(100, round(score))
     
-    bucket = "low"
-    if normalized >= 80:
-        bucket = "critical"
-    elif normalized >= 50:
-        bucket = "high"
-    elif normalized >= 20:
-        bucket = "medium"
+    bucket = risk_bucket(normalized)
     
     compliance = {
-        "gdpr": any(t in type_counts for t in ["person_name", "address", "email", "ip", "dob"]),
-        "dpdp": any(t in type_counts for t in ["aadhaar", "phone", "email", "pan", "bank_account"]),
-        "hipaa": any(t in type_counts for t in ["person_name", "address", "dob"]),
-        "pci_dss": any(t in type_counts for t in ["credit_card"]),
+        "gdpr": bool(_GDPR_TYPES & unique_types),
+        "dpdp": bool(_DPDP_TYPES & unique_types),
+        "hipaa": bool(_HIPAA_TYPES & unique_types),
+        "pci_dss": bool(_PCI_TYPES & unique_types),
     }
 
     return {
         "score": normalized,
         "bucket": bucket,
-        "counts": type_counts,
+        "counts": dict(type_counts),
         "placeholders": placeholder_count,
         "compliance": compliance,
     }
 
 
 def _deduplicate_entities(entities: List[Entity]) -> List[Entity]:
+    # Sorted by start (longest first), so a kept entity can only overlap the
+    # furthest-reaching one kept before it: a running max end is enough.
     entities = sorted(entities, key=lambda e: (e.start, -(e.end - e.start)))
     pruned: List[Entity] = []
+    max_end = -1
     for ent in entities:
-        if any(_overlaps(ent, existing) for existing in pruned):
+        if ent.start < max_end:
             continue
         pruned.append(ent)
+        max_end = ent.end
     return pruned
-
-
-def _overlaps(a: Entity, b: Entity) -> bool:
-    return not (a.end <= b.start or b.end <= a.start)
@@ -3,55 +3,132 @@ from __future__ import annotations
 
 import io
 import csv
-from typing import BinaryIO
+import os
+from typing import BinaryIO, Iterable, Iterator, List, Union
 
 import pypdf
 import docx
 import openpyxl
 
-SUPPORTED_TYPES = {"pdf", "docx", "csv", "xlsx", "txt"}
+from .config import DEFAULT_MAX_FILE_SIZE_BYTES
 
+try:
+    from python_calamine import CalamineWorkbook  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    CalamineWorkbook = None
 
-def extract_text(filename: str, file_bytes: bytes) -> str:
-    ext = filename.lower().split(".")[-1]
+SUPPORTED_TYPES = frozenset({"pdf", "docx", "csv", "xlsx", "txt"})
+
+# CSV/XLSX rows are handed out in blocks of this size by extract_text_stream
+ROWS_PER_BLOCK = 1000
+
+
+def file_extension(filename: str) -> str:
+    """Lowercased extension without the dot, or "" if there is none."""
+    return os.path.splitext(filename)[1][1:].lower()
+
+
+def extract_text(filename: str, source: Union[bytes, BinaryIO]) -> str:
+    """Extract text from raw bytes or a seekable binary stream (e.g. an upload)."""
+    return "\n".join(extract_text_stream(filename, source))
+
+
+def extract_text_stream(filename: str, source: Union[bytes, BinaryIO]) -> Iterator[str]:
+    """Yield text blocks (pages, paragraph or row batches) that join with "\n" into extract_text()."""
+    if _source_size(source) > DEFAULT_MAX_FILE_SIZE_BYTES:
+        raise ValueError(f"file too large (limit {DEFAULT_MAX_FILE_SIZE_BYTES // (1024 * 1024)} MB)")
+    ext = file_extension(filename)
     if ext == "pdf":
-        return _extract_pdf(file_bytes)
+        return _extract_pdf(_as_stream(source))
     if ext == "docx":
-        return _extract_docx(file_bytes)
+        return _extract_docx(_as_stream(source))
     if ext == "csv":
-        return _extract_csv(file_bytes)
+        return _row_blocks(_extract_csv_stream(_as_bytes(source)))
     if ext == "xlsx":
-        return _extract_xlsx(file_bytes)
-    return _extract_txt(file_bytes)
+        return _extract_xlsx(_as_stream(source))
+    return iter([_extract_txt(_as_bytes(source))])
+
+
+def _source_size(source: Union[bytes, BinaryIO]) -> int:
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    if isinstance(source, memoryview):
+        return source.nbytes
+    position = source.tell()
+    size = source.seek(0, io.SEEK_END)
+    source.seek(position)
+    return size
+
+
+def _as_stream(source: Union[bytes, BinaryIO]) -> BinaryIO:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
 
 
-def _extract_pdf(data: bytes) -> str:
-    reader = pypdf.PdfReader(io.BytesIO(data))
-    return "\n".join(page.extract_text() or "" for page in reader.pages)
+def _as_bytes(source: Union[bytes, BinaryIO]) -> bytes:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    return source.read()
 
 
-def _extract_docx(data: bytes) -> str:
-    document = docx.Document(io.BytesIO(data))
-    return "\n".join(p.text for p in document.paragraphs)
+def _extract_pdf(stream: BinaryIO) -> Iterator[str]:
+    reader = pypdf.PdfReader(stream)
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def _extract_docx(stream: BinaryIO) -> Iterator[str]:
+    document = docx.Document(stream)
+    yield "\n".join(p.text for p in document.paragraphs)
 
 
 def _extract_csv(data: bytes) -> str:
-    decoded = data.decode("utf-8", errors="ignore")
-    output_lines = []
-    for row in csv.reader(io.StringIO(decoded)):
-        output_lines.append(", ".join(row))
-    return "\n".join(output_lines)
+    return "\n".join(_extract_csv_stream(data))
+
+
+def _extract_csv_stream(data: bytes) -> Iterator[str]:
+    # Decode incrementally instead of materializing a second full-size copy as str
+    text = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", errors="ignore", newline="")
+    for row in csv.reader(text):
+        yield ", ".join(row)
+
 
+def _extract_xlsx(stream: BinaryIO) -> Iterator[str]:
+    return _row_blocks(", ".join(row_values) for row_values in _xlsx_rows(stream) if row_values)
 
-def _extract_xlsx(data: bytes) -> str:
-    wb = openpyxl.load_workbook(io.BytesIO(data), data_only=True, read_only=True)
-    lines = []
+
+def _row_blocks(lines: Iterable[str]) -> Iterator[str]:
+    """Group lines into blocks of ROWS_PER_BLOCK, joined with "\n"."""
+    block: List[str] = []
+    for line in lines:
+        block.append(line)
+        if len(block) >= ROWS_PER_BLOCK:
+            yield "\n".join(block)
+            block = []
+    if block:
+        yield "\n".join(block)
+
+
+def _xlsx_rows(stream: BinaryIO) -> Iterator[List[str]]:
+    """Yield each row's non-empty cells as strings, via calamine when installed."""
+    if CalamineWorkbook is not None:
+        wb = CalamineWorkbook.from_filelike(stream)
+        for name in wb.sheet_names:
+            for row in wb.get_sheet_by_name(name).iter_rows():
+                yield [_calamine_cell(cell) for cell in row if cell is not None and cell != ""]
+        return
+    wb = openpyxl.load_workbook(stream, data_only=True, read_only=True)
     for sheet in wb:
         for row in sheet.iter_rows(values_only=True):
-            row_values = [str(cell) for cell in row if cell is not None]
-            if row_values:
-                lines.append(", ".join(row_values))
-    return "\n".join(lines)
+            yield [str(cell) for cell in row if cell is not None]
+
+
+def _calamine_cell(cell) -> str:
+    # calamine reads every number as float; keep whole numbers (IDs, phones) digit-only
+    if isinstance(cell, float) and cell.is_integer():
+        return str(int(cell))
+    return str(cell)
 
 
 def _extract_txt(data: bytes) -> str:
@@ -0,0 +1,21 @@
+"""Luhn (mod 10) checksum helpers shared by card detection and synthetic masking."""
+from __future__ import annotations
+
+# Byte-level digit -> digit sum of its double, so doubling is one translate call
+_DOUBLED = bytes.maketrans(b"0123456789", b"0246813579")
+
+
+def luhn_sum(digits: str) -> int:
+    """Luhn checksum of an ASCII digit string; the number is valid when it is a multiple of 10."""
+    data = digits.encode("ascii")[::-1]
+    # Summing bytes adds ord("0") per digit, removed by the final subtraction
+    return sum(data[0::2]) + sum(data[1::2].translate(_DOUBLED)) - 48 * len(data)
+
+
+def luhn_valid(digits: str) -> bool:
+    return luhn_sum(digits) % 10 == 0
+
+
+def luhn_check_digit(payload: str) -> str:
+    """Digit to append to ``payload`` to make it Luhn-valid."""
+    return str(-luhn_sum(payload + "0") % 10)
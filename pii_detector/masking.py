@@ -1,11 +1,15 @@
 """Masking and synthetic replacement utilities."""
 from __future__ import annotations
 
+import functools
 import itertools
-from typing import List
+import re
+from typing import Callable, Dict, Iterable, List, Tuple
 
 from .detection import Entity
+from .luhn import luhn_check_digit
 
+_DIGIT_RE = re.compile(r"\d")
 
 FULL_TOKENS = {
     "email": "[EMAIL]",
@@ -24,17 +28,37 @@ FULL_TOKENS = {
 
 
 def mask_value(value: str, label: str, mode: str) -> str:
+    # Synthetic values come from a running counter, so only full/partial are cached
+    if mode == "synthetic":
+        return _synthetic(value, label)
+    return _mask_value_cached(value, label, mode)
+
+
+@functools.lru_cache(maxsize=4096)
+def _mask_value_cached(value: str, label: str, mode: str) -> str:
+    return _label_masker(label, mode)(value)
+
+
+def _label_masker(label: str, mode: str) -> Callable[[str], str]:
+    """Resolve the masking function for one label/mode pair."""
+    if mode == "synthetic":
+        return functools.partial(_synthetic, label=label)
     if mode == "partial":
         if label in {"credit_card", "debit_card", "bank_account", "aadhaar"}:
-            return _mask_digits_keep_tail(value, 4)
+            return functools.partial(_mask_digits_keep_tail, keep=4)
         if label == "phone":
-            return _mask_digits_keep_tail(value, 3)
+            return functools.partial(_mask_digits_keep_tail, keep=3)
         if label == "email":
-            return _mask_email(value)
-        return _generic_mask(value, label)
-    if mode == "synthetic":
-        return _synthetic(value, label)
-    return _generic_mask(value, label)
+            return _mask_email
+    token = _generic_mask("", label)
+    return lambda _value: token
+
+
+def _document_masker(label: str, mode: str) -> Callable[[str], str]:
+    """Like _label_masker, but partial masks go through the shared value cache."""
+    if mode == "partial":
+        return lambda value: _mask_value_cached(value, label, mode)
+    return _label_masker(label, mode)
 
 
 def apply_masks(
@@ -44,33 +68,62 @@ def apply_masks(
     include_placeholders: bool = False,
     allowed_labels: List[str] | None = None,
 ) -> str:
-    # Apply masks from end to start to keep offsets stable
-    sorted_entities = sorted(entities, key=lambda e: e.start, reverse=True)
-    masked = text
-    for ent in sorted_entities:
-        if allowed_labels and ent.label not in allowed_labels:
-            continue
-        if ent.placeholder and not include_placeholders:
-            continue
-        replacement = mask_value(ent.value, ent.label, mode)
-        masked = masked[: ent.start] + replacement + masked[ent.end :]
-    return masked
+    return compile_masker(mode, allowed_labels, include_placeholders)(text, entities)
+
+
+def compile_masker(
+    mode: str = "full",
+    allowed_labels: Iterable[str] | None = None,
+    include_placeholders: bool = False,
+) -> Callable[[str, List[Entity]], str]:
+    """Return a masking function for one configuration, reused across documents."""
+    return _compile_masker(mode, tuple(allowed_labels or ()), include_placeholders)
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_masker(
+    mode: str, allowed_labels: Tuple[str, ...], include_placeholders: bool
+) -> Callable[[str, List[Entity]], str]:
+    allowed = frozenset(allowed_labels)
+    # Filled per label on first use, so labels outside FULL_TOKENS (e.g. dob) work too
+    maskers: Dict[str, Callable[[str], str]] = {}
+
+    def masker(text: str, entities: List[Entity]) -> str:
+        # Single left-to-right pass; entities overlapping an earlier mask are skipped
+        parts: List[str] = []
+        cursor = 0
+        for ent in sorted(entities, key=_entity_start):
+            if allowed and ent.label not in allowed:
+                continue
+            if ent.placeholder and not include_placeholders:
+                continue
+            if ent.start < cursor:
+                continue
+            mask = maskers.get(ent.label)
+            if mask is None:
+                mask = maskers[ent.label] = _document_masker(ent.label, mode)
+            parts.append(text[cursor : ent.start])
+            parts.append(mask(ent.value))
+            cursor = ent.end
+        parts.append(text[cursor:])
+        return "".join(parts)
+
+    return masker
+
+
+def _entity_start(ent: Entity) -> int:
+    return ent.start
 
 
 def _mask_digits_keep_tail(value: str, keep: int) -> str:
     # Preserve separators and length; keep last N digits, mask other digits with '*'
-    out_chars = []
-    digits_seen = 0
-    for ch in reversed(value):
-        if ch.isdigit():
-            digits_seen += 1
-            if digits_seen <= keep:
-                out_chars.append(ch)
-            else:
-                out_chars.append("*")
-        else:
-            out_chars.append(ch)
-    return "".join(reversed(out_chars))
+    if len(value) <= keep:
+        return value
+    positions = [m.start() for m in _DIGIT_RE.finditer(value)]
+    if len(positions) <= keep:
+        return value
+    split = positions[-keep] if keep else len(value)
+    return _DIGIT_RE.sub("*", value[:split]) + value[split:]
 
 
 def _mask_email(value: str) -> str:
@@ -120,7 +173,7 @@ def _synthetic_card(counter: int, original: str) -> str:
     # Generate a 16-digit Luhn-valid number, keep grouping if present in original
     digits_needed = 15
     base = "4" + _pad_digits(counter, digits_needed - 1)
-    check = _luhn_check_digit(base)
+    check = luhn_check_digit(base)
     number = base + check
     return _regroup_like_original(number, original)
 
@@ -168,31 +221,11 @@ def _pad_digits(counter: int, length: int) -> str:
     return s
 
 
-def _luhn_check_digit(number_without_check: str) -> str:
-    digits = [int(d) for d in number_without_check]
-    digits.reverse()
-    total = 0
-    for idx, d in enumerate(digits):
-        if idx % 2 == 0:
-            d = d * 2
-            if d > 9:
-                d -= 9
-        total += d
-    check = (10 - (total % 10)) % 10
-    return str(check)
-
-
 def _regroup_like_original(synth: str, original: str) -> str:
     # Preserve separators from the original; replace digit slots with synthetic digits in order.
     digits_iter = iter(synth)
-    rebuilt = []
-    for ch in original:
-        if ch.isdigit():
-            rebuilt.append(next(digits_iter, ""))
-        else:
-            rebuilt.append(ch)
+    rebuilt = _DIGIT_RE.sub(lambda _m: next(digits_iter, ""), original)
     # Append any remaining digits (if original had fewer digits than synth)
-    rebuilt.append("".join(digits_iter))
-    candidate = "".join(rebuilt)
+    candidate = rebuilt + "".join(digits_iter)
     # Fallback to plain synth if we ended up empty (e.g., original had no digits)
-    return candidate if any(c.isdigit() for c in candidate) else synth
+    return candidate if _DIGIT_RE.search(candidate) else synth
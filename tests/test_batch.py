@@ -0,0 +1,32 @@
+from pii_detector import batch
+from pii_detector.batch import process_files
+
+
+def test_process_files_reports_entities_and_errors(tmp_path):
+    good = tmp_path / "good.txt"
+    good.write_text("Reach me at user@example.com")
+    bad = tmp_path / "bad.pdf"
+    bad.write_bytes(b"not a pdf")
+    seen = []
+
+    results = {r.filename: r for r in process_files([str(good), str(bad)], workers=2, callback=seen.append, mode="regex")}
+
+    assert len(seen) == 2
+    assert results[str(good)].error is None
+    assert [e.label for e in results[str(good)].entities] == ["email"]
+    assert results[str(bad)].error and not results[str(bad)].entities
+
+
+def test_process_group_passes_lazy_to_detection(tmp_path, monkeypatch):
+    path = tmp_path / "doc.txt"
+    path.write_text("user@example.com")
+    calls = []
+
+    def fake_detect(texts, mode, lazy):
+        calls.append(lazy)
+        return iter([[] for _ in texts])
+
+    monkeypatch.setattr(batch, "detect_pii_batch", fake_detect)
+    batch._process_group([str(path)], "hybrid", lazy=False)
+    batch._process_group([str(path)], "hybrid")
+    assert calls == [False, True]
@@ -0,0 +1,137 @@
+import re
+import time
+
+import pytest
+
+from pii_detector import detection
+from pii_detector.config import PII_COMBINED
+from pii_detector.detection import (
+    _combined_searcher,
+    clear_pii_cache,
+    detect_pii,
+    detect_pii_batch,
+    detect_placeholders,
+    detect_regex,
+)
+
+
+def test_detect_regex_prefers_longest_match_at_offset():
+    entities = detect_regex("Contact ABCDE1234F@example.in or PAN ABCDE1234F")
+    labels = [(e.label, e.value) for e in entities]
+    assert ("email", "ABCDE1234F@example.in") in labels
+    assert ("pan", "ABCDE1234F") in labels
+
+
+def test_detect_regex_bank_account_value_is_digits():
+    entities = detect_regex("Account no: 123456789012")
+    bank = [e for e in entities if e.label == "bank_account"]
+    assert bank and bank[0].value == "123456789012"
+
+
+def test_detect_regex_phone_requires_separator_after_country_code():
+    values = [e.value for e in detect_regex("Call +91 987-654-3210 or 919876543210") if e.label == "phone"]
+    assert values == ["91 987-654-3210"]
+
+
+def test_detect_regex_ip_rejects_out_of_range_octets():
+    values = [e.value for e in detect_regex("Hosts 192.168.1.1 and 10.0.0.256") if e.label == "ip"]
+    assert values == ["192.168.1.1"]
+
+
+def test_detect_regex_cards_require_luhn():
+    entities = detect_regex("Cards 4111111111111111, 4111111111111112 and 6200000000000005")
+    cards = [(e.label, e.value) for e in entities if e.label in {"credit_card", "debit_card"}]
+    assert cards == [("credit_card", "4111111111111111"), ("debit_card", "6200000000000005")]
+
+
+def test_detect_placeholders_flags_every_occurrence():
+    hits = [e.value for e in detect_placeholders("Phone: N/A, Email: n/a, Name: John Doe")]
+    assert hits == ["N/A", "n/a", "John Doe"]
+
+
+def test_detect_pii_cached_results_are_independent_lists():
+    clear_pii_cache()
+    first = detect_pii("PAN ABCDE1234F", mode="regex")
+    first.clear()
+    second = detect_pii("PAN ABCDE1234F", mode="regex")
+    assert [e.label for e in second] == ["pan"]
+
+
+def test_combined_searcher_matches_full_scan():
+    text = "Mail ABCDE1234F@x.com, a/c 123456789012, Ravi Kumar\n4111111111111111 on 12/05/1990 café"
+    for sample in (text, text.encode("ascii", "ignore").decode()):
+        search = _combined_searcher(sample)
+        for pos in range(len(sample) + 1):
+            expected = PII_COMBINED.search(sample, pos)
+            found = search(pos)
+            assert (found and (found.span(), found.lastgroup)) == (expected and (expected.span(), expected.lastgroup))
+
+
+def test_detect_regex_does_not_report_suffixes_of_overlapped_matches():
+    # Scanning each pattern separately, these emails start inside the bank account /
+    # name and are dropped as overlaps; their suffixes must not surface as new emails
+    entities = detect_regex("acct 123456789012-test@example.com")
+    assert [(e.label, e.placeholder) for e in entities] == [("bank_account", False), ("placeholder", True)]
+    entities = detect_regex("Rahul Sharma.test@example.com")
+    assert [(e.label, e.placeholder) for e in entities] == [("person_name", False), ("placeholder", True)]
+    entities = detect_regex("born 12/05/1990.a@b.co")
+    assert [e.label for e in entities] == ["dob"]
+
+
+def test_detect_regex_email_local_part_may_start_with_underscore():
+    for text, email in (
+        ("mail _john@example.com now", "_john@example.com"),
+        ("__init@x.io", "__init@x.io"),
+        ("reach _ops.team@corp.in", "_ops.team@corp.in"),
+    ):
+        assert [e.value for e in detect_regex(text) if e.label == "email"] == [email]
+
+
+def test_combined_scan_ignores_re2_for_unicode_patterns():
+    # RE2's \s is ASCII-only; the combined scan must still see non-breaking spaces
+    pytest.importorskip("re2")
+    assert isinstance(PII_COMBINED, re.Pattern)
+    assert [e.value for e in detect_regex("Ravi\u00a0Kumar")] == ["Ravi\u00a0Kumar"]
+
+
+def test_detect_regex_adversarial_inputs_stay_linear():
+    for text in ("a" * 10000 + "@", "a." * 5000 + "@", "1." * 5000, "x@" + "a." * 5000):
+        started = time.perf_counter()
+        detect_regex(text)
+        assert time.perf_counter() - started < 0.1, text[:10]
+
+
+def test_detect_pii_accepts_lone_surrogates():
+    clear_pii_cache()
+    entities = detect_pii("hi \ud800 test@example.com", mode="regex")
+    assert [e.label for e in entities if not e.placeholder] == ["email"]
+
+
+def test_nlp_chunk_offsets_map_back_to_text(monkeypatch):
+    spacy = pytest.importorskip("spacy")
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns([
+        {"label": "PERSON", "pattern": "Anita Rao"},
+        {"label": "GPE", "pattern": "Mumbai"},
+    ])
+    monkeypatch.setattr(detection, "load_nlp_model", lambda: nlp)
+    monkeypatch.setattr(detection, "NLP_CHUNK_CHARS", 40)
+    texts = [
+        "Intro line here.\n\nAnita Rao moved to Mumbai last year.\nMail a@b.co\n\n" * 3,
+        "Short note from Anita Rao",
+    ]
+
+    clear_pii_cache()
+    try:
+        single = [detect_pii(text, mode="hybrid", lazy=False) for text in texts]
+        assert list(detect_pii_batch(texts, mode="hybrid", lazy=False)) == single
+    finally:
+        clear_pii_cache()
+
+    for text, entities in zip(texts, single):
+        for e in entities:
+            assert text[e.start : e.end] == e.value
+    assert [e.value for e in single[0] if e.label == "address"] == ["Mumbai"] * 3
+    assert [e.value for e in single[0] if e.label == "person_name"] == ["Anita Rao"] * 3
+    assert [e.value for e in single[1] if e.label == "person_name"] == ["Anita Rao"]
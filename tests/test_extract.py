@@ -0,0 +1,49 @@
+import io
+
+import openpyxl
+import pytest
+
+from pii_detector import extract
+from pii_detector.config import DEFAULT_MAX_FILE_SIZE_BYTES
+from pii_detector.detection import detect_regex, detect_regex_stream
+
+
+def test_xlsx_stream_blocks_keep_global_offsets(monkeypatch):
+    monkeypatch.setattr(extract, "ROWS_PER_BLOCK", 10)
+    workbook = openpyxl.Workbook()
+    for i in range(25):
+        workbook.active.append([f"row {i}", "user@example.com" if i % 7 == 0 else None])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    blocks = list(extract.extract_text_stream("sheet.xlsx", buffer.getvalue()))
+    text = extract.extract_text("sheet.xlsx", buffer.getvalue())
+
+    assert len(blocks) == 3
+    assert "\n".join(blocks) == text
+    streamed = [(e.label, e.start, e.end) for e in detect_regex_stream(blocks)]
+    assert streamed == [(e.label, e.start, e.end) for e in detect_regex(text)]
+
+
+def test_extract_text_rejects_oversized_input():
+    oversized = io.BytesIO(b"%PDF-" + b"0" * DEFAULT_MAX_FILE_SIZE_BYTES)
+    with pytest.raises(ValueError, match="too large"):
+        extract.extract_text("big.pdf", oversized)
+
+
+@pytest.mark.parametrize("use_calamine", [True, False])
+def test_xlsx_numeric_phone_cell_has_no_float_suffix(monkeypatch, use_calamine):
+    if use_calamine and extract.CalamineWorkbook is None:
+        pytest.skip("python-calamine not installed")
+    if not use_calamine:
+        monkeypatch.setattr(extract, "CalamineWorkbook", None)
+    workbook = openpyxl.Workbook()
+    workbook.active.append(["Phone", 9876543210, 2.5])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    text = extract.extract_text("sheet.xlsx", buffer.getvalue())
+
+    assert "9876543210" in text
+    assert "9876543210.0" not in text
+    assert "2.5" in text
@@ -8,3 +8,48 @@ def test_mask_returns_masked_text():
     assert resp.status_code == 200
     data = resp.get_json()
     assert "[EMAIL]" in data["masked"]
+
+
+def test_detect_and_mask_accept_lone_surrogates():
+    client = app.test_client()
+    payload = {"text": "hi \ud800 test@example.com", "mode": "regex", "masking": "full"}
+    resp = client.post("/api/detect", json=payload)
+    assert resp.status_code == 200
+    assert resp.get_json()["text"] == payload["text"]
+    resp = client.post("/api/mask", json=payload)
+    assert resp.status_code == 200
+
+
+def test_mask_waits_for_nlp_in_hybrid_mode(monkeypatch):
+    import threading
+    import time
+
+    import app as app_module
+
+    def slow_load():
+        time.sleep(0.05)
+        return None
+
+    monkeypatch.setattr(app_module, "load_nlp_model", slow_load)
+    monkeypatch.setattr(app_module, "_nlp_ready", threading.Event())
+    monkeypatch.setattr(app_module, "_nlp_warm_started", False)
+    client = app.test_client()
+    payload = {"text": "x" * 60_000 + " test@example.com", "mode": "hybrid", "masking": "full"}
+    resp = client.post("/api/mask", json=payload)
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["nlp"] is True
+    assert app_module._nlp_ready.is_set()
+    assert data["masked"].endswith("[EMAIL]")
+
+
+def test_mask_ignores_non_string_mask_types():
+    client = app.test_client()
+    payload = {"text": "Email: test@example.com", "mode": "regex", "maskTypes": [["email"], "email", 3]}
+    resp = client.post("/api/mask", json=payload)
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["maskTypes"] == ["email"]
+    assert "[EMAIL]" in data["masked"]
+    resp = client.post("/api/mask", json={**payload, "maskTypes": {"email": True}})
+    assert resp.status_code == 200
@@ -1,4 +1,5 @@
-from pii_detector.masking import _mask_digits_keep_tail
+from pii_detector.detection import detect_regex
+from pii_detector.masking import _mask_digits_keep_tail, _mask_value_cached, compile_masker
 
 
 def test_mask_digits_keep_tail_preserves_separators():
@@ -7,3 +8,20 @@ def test_mask_digits_keep_tail_preserves_separators():
     assert masked.count("-") == 2
     # First digits should be masked
     assert masked.startswith("****-**")
+
+
+def test_compile_masker_is_reused_and_respects_allowed_labels():
+    text = "Mail x@y.com or call +91 987-654-3210"
+    masker = compile_masker("partial", ["email"])
+    assert masker is compile_masker("partial", ("email",))
+    assert masker(text, detect_regex(text)) == "Mail x***@y.com or call +91 987-654-3210"
+
+
+def test_compile_masker_reuses_cached_partial_masks():
+    text = "Mail x@y.com"
+    entities = detect_regex(text)
+    masker = compile_masker("partial")
+    masker(text, entities)
+    hits = _mask_value_cached.cache_info().hits
+    assert masker(text, entities) == "Mail x***@y.com"
+    assert _mask_value_cached.cache_info().hits == hits + 1
@@ -0,0 +1,30 @@
+from app import app
+
+# re._compiler on Python 3.11+, sre_compile before that
+try:
+    from re import _compiler as regex_compiler
+except ImportError:  # pragma: no cover - older Python
+    import sre_compile as regex_compiler
+
+
+def test_requests_do_not_compile_regexes(monkeypatch):
+    client = app.test_client()
+    payload = {
+        "text": "Ravi Kumar, ravi@example.in, 987-654-3210, 4111111111111111, 10.0.0.1, A/c 123456789012",
+        "mode": "regex",
+        "masking": "partial",
+    }
+    client.post("/api/detect", json=payload)  # warm up Flask/Werkzeug internals
+
+    compiled = []
+    real_compile = regex_compiler.compile
+
+    def recording_compile(pattern, flags=0):
+        compiled.append(pattern)
+        return real_compile(pattern, flags)
+
+    monkeypatch.setattr(regex_compiler, "compile", recording_compile)
+    payload["text"] += " PAN ABCDE1234F"
+    assert client.post("/api/detect", json=payload).status_code == 200
+    assert client.post("/api/mask", json=payload).status_code == 200
+    assert compiled == []
@@ -0,0 +1,34 @@
+import io
+
+import docx
+
+from app import app
+
+
+def test_detect_accepts_uploaded_docx():
+    document = docx.Document()
+    document.add_paragraph("Reach me at test.user@example.in")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    buffer.seek(0)
+
+    client = app.test_client()
+    resp = client.post(
+        "/api/detect",
+        data={"file": (buffer, "sample.docx"), "mode": "regex"},
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 200
+    labels = {e["label"] for e in resp.get_json()["entities"]}
+    assert "email" in labels
+
+
+def test_oversized_upload_returns_json_413():
+    client = app.test_client()
+    resp = client.post(
+        "/api/detect",
+        data={"file": (io.BytesIO(b"0" * (11 * 1024 * 1024)), "big.txt")},
+        content_type="multipart/form-data",
+    )
+    assert resp.status_code == 413
+    assert resp.get_json()["error"] == "file too large"